@@ -6,6 +6,10 @@ from typing import List
 import mlflow.pyfunc
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
+import os
+import logging
+from contextlib import asynccontextmanager
+from prediction_log import PredictionLogger
 
 ### 
 # Define configurations 
@@ -56,15 +60,35 @@ description = '''
 # URI of the tracking server (Hugging Face Space)
 mlflow.set_tracking_uri("https://jedha0padavan-mlflow-server-final-project.hf.space")
 
+# Model served by /predict, also used to tag the prediction log
+model_uri = "runs:/9a0814e20c0b482d9d5a66587c258ee1/model"
+
+# Background writer recording every prediction for retraining and audit
+prediction_logger = PredictionLogger(
+    log_dir=os.environ.get("PREDICTION_LOG_DIR", "prediction_logs"),
+    model_version=model_uri.split("/")[1],
+    max_queue_size=int(os.environ.get("PREDICTION_LOG_QUEUE_SIZE", 10000)),
+    overflow_policy=os.environ.get("PREDICTION_LOG_OVERFLOW", "drop"),
+    upload_uri=os.environ.get("PREDICTION_LOG_UPLOAD_URI"),
+)
+
+# Start the prediction log writer with the app, flush it on shutdown
+@asynccontextmanager
+async def lifespan(app):
+    prediction_logger.start()
+    yield
+    prediction_logger.stop()
 
 
 # Initiate FastAPI
 app = FastAPI(
     title = "API de Prédiction des Prix Getaround",
     description=description,
-    version = "0.1"
+    version = "0.1",
+    lifespan=lifespan
     
 )
+
 # Root endpoint - landing page
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
 async def root():
@@ -118,16 +142,24 @@ async def predict(data: PredictionInput):
     #loaded_model = mlflow.pyfunc.load_model(model_path)
 
     #load model directly from S3 artifacts
-    model_uri = "runs:/9a0814e20c0b482d9d5a66587c258ee1/model"
     loaded_model = mlflow.pyfunc.load_model(model_uri)
 
     try:
-        df = pd.DataFrame([item.model_dump() for item in data.input])
+        records = [item.model_dump() for item in data.input]
+        df = pd.DataFrame(records)
         prediction = loaded_model.predict(df)
-        return {"prediction": prediction.tolist()}
     except Exception as e:
         return {"error": str(e)}
 
+    # Non-blocking: records are written to Parquet by a background thread.
+    # Logging must never cost the client its prediction.
+    try:
+        prediction_logger.log(records, prediction)
+    except Exception:
+        logging.getLogger(__name__).exception("Failed to log prediction")
+
+    return {"prediction": prediction.tolist()}
+
 
 
 if __name__ == "__main__":
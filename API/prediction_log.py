@@ -0,0 +1,246 @@
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import fsspec
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+log = logging.getLogger(__name__)
+
+###
+# Asynchronous prediction log
+###
+# Every scored request is pushed to a bounded in-memory queue by `log()`,
+# which never blocks. A background thread drains the queue in batches and
+# appends them as row groups to Parquet files, rotated by size or age. The
+# age limit is also checked while the queue is idle, so a file gets its
+# footer at most `max_file_age` seconds after it was opened.
+# Files are named `predictions_<model_version>_<timestamp>_<id>.parquet`
+# so that several gunicorn workers can write to the same directory. While
+# being written they carry a leading dot, which pandas/pyarrow ignore when
+# reading the directory.
+# With `upload_uri` (e.g. an S3 prefix), closed files are copied there and
+# removed locally, since the container disk does not survive a restart.
+
+
+class PredictionLogger:
+    def __init__(
+        self,
+        log_dir,
+        model_version,
+        max_queue_size=10000,
+        batch_size=500,
+        flush_interval=5.0,
+        max_file_bytes=64 * 1024 * 1024,
+        max_file_age=300.0,
+        overflow_policy="drop",
+        sample_rate=0.1,
+        report_interval=60.0,
+        upload_uri=None,
+    ):
+        if overflow_policy not in ("drop", "sample"):
+            raise ValueError("overflow_policy must be 'drop' or 'sample'")
+        self.log_dir = log_dir
+        self.model_version = model_version
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age = max_file_age
+        self.overflow_policy = overflow_policy
+        self.sample_rate = sample_rate
+        self.report_interval = report_interval
+        self.upload_uri = upload_uri
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._reported_at = time.monotonic()
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._writer = None
+        self._schema = None
+        self._path = None
+        self._tmp_path = None
+        self._opened_at = 0.0
+
+    # Called from the request handler: must stay cheap and never block
+    def log(self, features, predictions):
+        logged_at = datetime.now(timezone.utc)
+        for record, prediction in zip(features, predictions):
+            record = dict(record)
+            record["prediction"] = float(prediction)
+            record["model_version"] = self.model_version
+            record["logged_at"] = logged_at
+            self._put(record)
+
+    def _put(self, record):
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        # Queue is full: "drop" discards the new record, "sample" keeps a
+        # fraction of the overflow by evicting the oldest queued record
+        if self.overflow_policy == "sample" and random.random() < self.sample_rate:
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+
+    def start(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._check_orphans()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._drain(timeout=self.flush_interval)
+            self._flush(batch)
+            self._report_dropped()
+        # Flush what is left before exiting
+        batch = self._drain(timeout=0)
+        while batch:
+            self._flush(batch)
+            batch = self._drain(timeout=0)
+        try:
+            self._close_file()
+        except Exception:
+            log.exception("Failed to close prediction log file")
+            self._abandon_file()
+        self._report_dropped(force=True)
+
+    # Errors are logged per batch so that the thread keeps running
+    def _flush(self, batch):
+        try:
+            if batch:
+                self._write(batch)
+            elif self._writer is not None and self._expired():
+                self._close_file()
+        except Exception:
+            log.exception("Failed to write %d logged predictions to %s", len(batch), self.log_dir)
+            self._abandon_file()
+
+    def _drain(self, timeout):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            # wait in short slices so that stop() is noticed quickly
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.2)))
+            except queue.Empty:
+                pass
+        return batch
+
+    def _write(self, batch):
+        table = pa.Table.from_pandas(pd.DataFrame(batch), preserve_index=False)
+        if self._writer is not None and (self._expired() or not table.schema.equals(self._schema)):
+            self._close_file()
+        if self._writer is None:
+            self._open_file(table.schema)
+        self._writer.write_table(table)
+        if os.path.getsize(self._tmp_path) >= self.max_file_bytes:
+            self._close_file()
+
+    def _expired(self):
+        return time.monotonic() - self._opened_at >= self.max_file_age
+
+    def _open_file(self, schema):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        version = str(self.model_version).replace("/", "-").replace(":", "-")
+        name = f"predictions_{version}_{stamp}_{uuid.uuid4().hex[:8]}.parquet"
+        self._path = os.path.join(self.log_dir, name)
+        # Write under a hidden name so readers never see a file without footer
+        self._tmp_path = os.path.join(self.log_dir, "." + name)
+        self._writer = pq.ParquetWriter(self._tmp_path, schema)
+        self._schema = schema
+        self._opened_at = time.monotonic()
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        writer, path, tmp_path = self._writer, self._path, self._tmp_path
+        self._writer = self._schema = self._path = self._tmp_path = None
+        writer.close()
+        os.replace(tmp_path, path)
+        if self.upload_uri:
+            self._upload(path)
+
+    # On failure the file stays in `log_dir` so that nothing is lost
+    def _upload(self, path):
+        try:
+            fs, root = fsspec.core.url_to_fs(self.upload_uri)
+            fs.makedirs(root, exist_ok=True)
+            fs.put_file(path, root.rstrip("/") + "/" + os.path.basename(path))
+        except Exception:
+            log.exception("Failed to upload %s to %s, kept locally", path, self.upload_uri)
+            return
+        os.remove(path)
+
+    # After a failed write the open file may be corrupt: leave it under its
+    # hidden name and start a new file with the next batch
+    def _abandon_file(self):
+        if self._writer is None:
+            return
+        writer, tmp_path = self._writer, self._tmp_path
+        self._writer = self._schema = self._path = self._tmp_path = None
+        try:
+            writer.close()
+        except Exception:
+            pass
+        log.warning("Abandoned prediction log file %s", tmp_path)
+
+    def _report_dropped(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._reported_at < self.report_interval:
+            return
+        dropped = self.dropped
+        if dropped > self._reported_dropped:
+            log.warning(
+                "Prediction log queue full (%s policy): %d records dropped since last report, %d in total",
+                self.overflow_policy,
+                dropped - self._reported_dropped,
+                dropped,
+            )
+        self._reported_dropped = dropped
+        self._reported_at = now
+
+    # Hidden files left by a killed worker have no footer and cannot be read.
+    # Files of live workers are closed after `max_file_age`, so older ones are
+    # reported; they are not deleted since another worker may share the directory.
+    def _check_orphans(self):
+        now = time.time()
+        for name in os.listdir(self.log_dir):
+            if not (name.startswith(".predictions_") and name.endswith(".parquet")):
+                continue
+            path = os.path.join(self.log_dir, name)
+            try:
+                age = now - os.path.getmtime(path)
+            except OSError:
+                continue
+            if age > self.max_file_age + self.flush_interval:
+                log.warning("Unreadable prediction log file left by an interrupted writer: %s", path)
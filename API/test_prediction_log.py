@@ -0,0 +1,190 @@
+import logging
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from prediction_log import PredictionLogger
+
+
+ITEM = {
+    "model_key": "Citroën",
+    "fuel": "gasoline",
+    "paint_color": "red",
+    "car_type": "sedan",
+    "private_parking_available": True,
+    "has_gps": False,
+    "has_air_conditioning": True,
+    "automatic_car": False,
+    "has_getaround_connect": True,
+    "has_speed_regulator": False,
+    "winter_tires": True,
+    "mileage": 12345.0,
+    "engine_power": 150.0,
+}
+
+
+def make_logger(log_dir, **kwargs):
+    kwargs.setdefault("flush_interval", 0.05)
+    return PredictionLogger(str(log_dir), "run123", **kwargs)
+
+
+def parquet_files(log_dir):
+    return sorted(name for name in os.listdir(log_dir) if name.endswith(".parquet"))
+
+
+def read_rows(log_dir):
+    files = [os.path.join(log_dir, name) for name in parquet_files(log_dir) if not name.startswith(".")]
+    return pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+
+def test_drop_policy_discards_new_records(tmp_path):
+    logger = make_logger(tmp_path, max_queue_size=2, overflow_policy="drop")
+    logger.log([ITEM] * 5, [1.0, 2.0, 3.0, 4.0, 5.0])
+    logger.start()
+    logger.stop()
+
+    assert logger.dropped == 3
+    assert read_rows(tmp_path)["prediction"].tolist() == [1.0, 2.0]
+
+
+def test_sample_policy_evicts_oldest_records(tmp_path):
+    logger = make_logger(tmp_path, max_queue_size=2, overflow_policy="sample", sample_rate=1.0)
+    logger.log([ITEM] * 5, [1.0, 2.0, 3.0, 4.0, 5.0])
+    logger.start()
+    logger.stop()
+
+    assert logger.dropped == 3
+    assert read_rows(tmp_path)["prediction"].tolist() == [4.0, 5.0]
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        PredictionLogger("logs", "run123", overflow_policy="block")
+
+
+def test_stop_flushes_and_renames(tmp_path):
+    logger = make_logger(tmp_path, flush_interval=60.0)
+    logger.start()
+    logger.log([ITEM] * 3, [1.0, 2.0, 3.0])
+    logger.stop()
+
+    files = parquet_files(tmp_path)
+    assert len(files) == 1
+    assert files[0].startswith("predictions_run123_")
+    assert len(read_rows(tmp_path)) == 3
+
+
+def test_rotation_by_size(tmp_path):
+    logger = make_logger(tmp_path, batch_size=2, max_file_bytes=1)
+    logger.log([ITEM] * 6, [1.0] * 6)
+    logger.start()
+    logger.stop()
+
+    assert len(parquet_files(tmp_path)) == 3
+
+
+def test_rotation_by_age(tmp_path):
+    logger = make_logger(tmp_path, batch_size=2, max_file_age=0.0)
+    logger.log([ITEM] * 6, [1.0] * 6)
+    logger.start()
+    logger.stop()
+
+    assert len(parquet_files(tmp_path)) == 3
+
+
+def test_sparse_records_share_one_file(tmp_path):
+    logger = make_logger(tmp_path)
+    logger.start()
+    for prediction in [1.0, 2.0, 3.0]:
+        logger.log([ITEM], [prediction])
+        # longer than flush_interval: the queue goes idle between records
+        time.sleep(0.2)
+    logger.stop()
+
+    assert len(parquet_files(tmp_path)) == 1
+    assert read_rows(tmp_path)["prediction"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_rotation_on_schema_change(tmp_path):
+    logger = make_logger(tmp_path, batch_size=1)
+    logger.log([ITEM, dict(ITEM, extra="x")], [1.0, 2.0])
+    logger.start()
+    logger.stop()
+
+    assert len(parquet_files(tmp_path)) == 2
+
+
+def test_write_error_keeps_thread_alive(tmp_path, caplog):
+    logger = make_logger(tmp_path, batch_size=1)
+    logger.log([dict(ITEM, mileage=object()), ITEM], [1.0, 2.0])
+    with caplog.at_level(logging.ERROR, logger="prediction_log"):
+        logger.start()
+        logger.stop()
+
+    assert "Failed to write" in caplog.text
+    assert read_rows(tmp_path)["prediction"].tolist() == [2.0]
+
+
+def test_dropped_records_are_reported(tmp_path, caplog):
+    logger = make_logger(tmp_path, max_queue_size=1)
+    logger.log([ITEM] * 3, [1.0, 2.0, 3.0])
+    with caplog.at_level(logging.WARNING, logger="prediction_log"):
+        logger.start()
+        logger.stop()
+
+    assert "2 records dropped" in caplog.text
+
+
+def test_orphaned_files_are_reported(tmp_path, caplog):
+    orphan = tmp_path / ".predictions_run123_old.parquet"
+    orphan.write_bytes(b"PAR1")
+    old = time.time() - 3600
+    os.utime(orphan, (old, old))
+
+    logger = make_logger(tmp_path)
+    with caplog.at_level(logging.WARNING, logger="prediction_log"):
+        logger.start()
+        logger.stop()
+
+    assert str(orphan) in caplog.text
+    assert orphan.exists()
+
+
+def test_closed_files_are_uploaded(tmp_path):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    logger = make_logger(local, upload_uri=str(remote))
+    logger.start()
+    logger.log([ITEM], [1.0])
+    logger.stop()
+
+    assert parquet_files(local) == []
+    assert len(parquet_files(remote)) == 1
+    assert read_rows(remote)["prediction"].tolist() == [1.0]
+
+
+def test_failed_upload_keeps_local_file(tmp_path, caplog):
+    local = tmp_path / "local"
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    logger = make_logger(local, upload_uri=str(blocker / "remote"))
+    with caplog.at_level(logging.ERROR, logger="prediction_log"):
+        logger.start()
+        logger.log([ITEM], [1.0])
+        logger.stop()
+
+    assert "Failed to upload" in caplog.text
+    assert read_rows(local)["prediction"].tolist() == [1.0]
+
+
+def test_written_columns(tmp_path):
+    logger = make_logger(tmp_path)
+    logger.start()
+    logger.log([ITEM, ITEM], [10.0, 20.0])
+    logger.stop()
+
+    df = read_rows(tmp_path)
+    assert list(df.columns) == list(ITEM) + ["prediction", "model_version", "logged_at"]
+    assert df["prediction"].tolist() == [10.0, 20.0]
+    assert set(df["model_version"]) == {"run123"}
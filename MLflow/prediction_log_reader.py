@@ -0,0 +1,52 @@
+import posixpath
+
+import fsspec
+import pandas as pd
+
+
+###
+# Reader for the prediction log written by the API (API/prediction_log.py)
+###
+# Closed log files are named `predictions_<model_version>_<timestamp>_<id>.parquet`.
+# Files still being written start with a dot and are skipped.
+# `log_dir` is a local path or a URI such as the S3 prefix the API uploads to
+# (PREDICTION_LOG_UPLOAD_URI). This needs pyarrow and fsspec, plus s3fs for S3.
+
+
+def read_prediction_log(log_dir, target="rental_price_per_day", model_version=None):
+    """Load logged predictions as a training frame.
+
+    Returns the request features with the logged prediction in the `target`
+    column, so the result can be concatenated with the pricing dataset.
+    """
+    fs, root = fsspec.core.url_to_fs(log_dir)
+    if not fs.isdir(root):
+        return pd.DataFrame()
+    files = sorted(
+        path
+        for path in fs.ls(root, detail=False)
+        if posixpath.basename(path).startswith("predictions_") and path.endswith(".parquet")
+    )
+    if not files:
+        return pd.DataFrame()
+    frames = []
+    for path in files:
+        with fs.open(path, "rb") as f:
+            frames.append(pd.read_parquet(f))
+    df = pd.concat(frames, ignore_index=True)
+    if model_version is not None:
+        df = df[df["model_version"] == model_version]
+    return df.drop(columns=["model_version", "logged_at"]).rename(columns={"prediction": target})
+
+
+def add_prediction_log(X_train, y_train, log_dir, model_version=None):
+    """Append logged predictions to a training split.
+
+    Only the columns of `X_train` are kept; `y_train.name` is used as target.
+    """
+    df_logged = read_prediction_log(log_dir, target=y_train.name, model_version=model_version)
+    if df_logged.empty:
+        return X_train, y_train
+    X_train = pd.concat([X_train, df_logged[X_train.columns]], ignore_index=True)
+    y_train = pd.concat([y_train, df_logged[y_train.name]], ignore_index=True)
+    return X_train, y_train
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from prediction_log_reader import add_prediction_log, read_prediction_log
+
+
+FEATURES = {
+    "model_key": "Citroën",
+    "fuel": "gasoline",
+    "paint_color": "red",
+    "car_type": "sedan",
+    "private_parking_available": True,
+    "has_gps": False,
+    "has_air_conditioning": True,
+    "automatic_car": False,
+    "has_getaround_connect": True,
+    "has_speed_regulator": False,
+    "winter_tires": True,
+    "mileage": 12345.0,
+    "engine_power": 150.0,
+}
+
+
+# Same layout as the files written by API/prediction_log.py
+def write_log(path, predictions, model_version="run123"):
+    logged_at = datetime.now(timezone.utc)
+    rows = [
+        dict(FEATURES, prediction=p, model_version=model_version, logged_at=logged_at)
+        for p in predictions
+    ]
+    pd.DataFrame(rows).to_parquet(path, index=False)
+
+
+def test_read_prediction_log(tmp_path):
+    write_log(tmp_path / "predictions_run123_a.parquet", [10.0, 20.0])
+    write_log(tmp_path / "predictions_run456_b.parquet", [30.0], model_version="run456")
+
+    df = read_prediction_log(str(tmp_path))
+    assert list(df.columns) == list(FEATURES) + ["rental_price_per_day"]
+    assert df["rental_price_per_day"].tolist() == [10.0, 20.0, 30.0]
+
+    df = read_prediction_log(str(tmp_path), model_version="run456")
+    assert df["rental_price_per_day"].tolist() == [30.0]
+
+
+def test_read_prediction_log_from_uri(tmp_path):
+    write_log(tmp_path / "predictions_run123_a.parquet", [10.0])
+
+    df = read_prediction_log(tmp_path.as_uri())
+    assert df["rental_price_per_day"].tolist() == [10.0]
+
+
+def test_read_prediction_log_skips_other_files(tmp_path):
+    write_log(tmp_path / "predictions_run123_a.parquet", [10.0])
+    write_log(tmp_path / "other.parquet", [99.0])
+    # file still being written: no footer yet
+    (tmp_path / ".predictions_run123_b.parquet").write_bytes(b"PAR1")
+
+    assert read_prediction_log(str(tmp_path))["rental_price_per_day"].tolist() == [10.0]
+
+
+def test_read_prediction_log_missing_or_empty_directory(tmp_path):
+    assert read_prediction_log(str(tmp_path / "missing")).empty
+    assert read_prediction_log(str(tmp_path)).empty
+
+
+def test_add_prediction_log(tmp_path):
+    write_log(tmp_path / "predictions_run123_a.parquet", [10.0, 20.0])
+    X_train = pd.DataFrame([FEATURES], index=[7])
+    y_train = pd.Series([50.0], index=[7], name="rental_price_per_day")
+
+    X, y = add_prediction_log(X_train, y_train, str(tmp_path))
+    assert list(X.columns) == list(FEATURES)
+    assert len(X) == 3
+    assert y.tolist() == [50.0, 10.0, 20.0]
+    assert y.name == "rental_price_per_day"
+
+    X, y = add_prediction_log(X_train, y_train, str(tmp_path / "missing"))
+    assert X is X_train and y is y_train
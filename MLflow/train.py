@@ -9,6 +9,8 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from mlflow.models.signature import infer_signature
 import pandas as pd
 import numpy as np
+import os
+from prediction_log_reader import add_prediction_log
 
 
 
@@ -30,6 +32,18 @@ bool_cols = [col for col in X.columns if col not in cat_cols + num_cols]
 # Train/test split
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
 
+# Optionally add predictions logged by the API as an extra training source.
+# They are only added to the train set so that metrics stay on real prices.
+# Set PREDICTION_LOG_MODEL_VERSION to a run id to keep only that model's
+# predictions; otherwise rows predicted by every past run are used as labels.
+# PREDICTION_LOG_DIR may be the S3 prefix the API uploads its log files to.
+prediction_log_dir = os.environ.get("PREDICTION_LOG_DIR")
+if prediction_log_dir:
+    X_train, y_train = add_prediction_log(
+        X_train, y_train, prediction_log_dir,
+        model_version=os.environ.get("PREDICTION_LOG_MODEL_VERSION") or None,
+    )
+
 # Define preprocessing
 preprocessor = ColumnTransformer([
     ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols) # to enable API handle new categories from input